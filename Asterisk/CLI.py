@@ -9,14 +9,11 @@ Asterisk/CLI.py: Command-line wrapper around the Asterisk Manager API.
 from __future__ import absolute_import
 from __future__ import print_function
 
-import inspect
+import functools
 import os
 import sys
 
 from Asterisk import BaseException  # pylint: disable=W0622
-from Asterisk import Config
-from Asterisk import Manager
-import Asterisk.Util
 
 __author__ = 'David M. Wilson <dw@autosols.com>'
 __id__ = '$Id$'
@@ -26,12 +23,7 @@ class ArgumentsError(BaseException):
     _prefix = 'bad arguments'
 
 
-def usage(argv0, out_file):
-    '''
-    Print command-line program usage.
-    '''
-    argv0 = os.path.basename(argv0)
-    usage_text = '''
+_USAGE_TEMPLATE = ''.join(line[6:] + '\n' for line in '''
         %(argv0)s actions
             Show available actions and their arguments.
 
@@ -48,61 +40,130 @@ def usage(argv0, out_file):
         %(argv0)s help <action>
             Display usage message for the given <action>.
 
-    ''' % locals()
-    out_file.writelines([line[6:] + '\n' for line in usage_text.splitlines()])
+    '''.splitlines())
+
+
+def usage(argv0, out_file):
+    '''
+    Print command-line program usage.
+    '''
+    out_file.write(_USAGE_TEMPLATE % {'argv0': os.path.basename(argv0)})
+
+
+# Heavier modules (inspect, Manager, Config, Util) are imported by the
+# functions needing them, so that "usage" and argument errors stay cheap.
+
+
+@functools.lru_cache(maxsize=None)
+def _arg_signature(fn):
+    '''
+    Return the formatted argument list of function <fn>, without its first
+    (self) argument.
+    '''
+
+    import inspect
+
+    signature = inspect.signature(fn)
+    params = list(signature.parameters.values())[1:]
+    return str(signature.replace(parameters=params))[1:-1]
+
+
+def _build_action_table():
+    '''
+    Return a mapping of lowercased action names to (name, arguments, docstring
+    lines) tuples describing every action supported by Manager.
+    '''
+
+    import inspect
+    from Asterisk import Manager
+
+    AllActions = type('AllActions',
+                      (Manager.CoreActions, Manager.ZapataActions), {})
+    table = {}
+
+    for name, method in inspect.getmembers(AllActions, inspect.isfunction):
+        if name[0] == '_':
+            continue
+
+        fmt = _arg_signature(method)
+        doc = inspect.getdoc(method) or ''
+        lines = tuple(x.strip() for x in doc.splitlines())
+        table[name.lower()] = (name, fmt, lines)
+
+    return table
+
+
+_ACTION_TABLE = None
+
+
+def _get_action_table():
+    'Return the action table, building it on first use.'
+
+    global _ACTION_TABLE
+
+    if _ACTION_TABLE is None:
+        _ACTION_TABLE = _build_action_table()
+
+    return _ACTION_TABLE
 
 
 def show_actions(action=None):
+    table = _get_action_table()
+
     if action is None:
         print()
         print('Supported actions and their arguments.')
         print('======================================')
         print()
+        actions = table.values()
 
-    class AllActions(Manager.CoreActions, Manager.ZapataActions):
-        pass
-
-    methods = [(name, obj) for (name, obj) in inspect.getmembers(AllActions)
-               if inspect.ismethod(obj) and name[0] != '_']
+    elif action.lower() in table:
+        actions = [table[action.lower()]]
 
-    if action is not None:
-        methods = [x for x in methods if x[0].lower() == action.lower()]
+    else:
+        actions = []
 
-    for name, method in methods:
-        arg_spec = inspect.getargspec(method)
-        arg_spec[0].pop(0)
+    for name, fmt, lines in actions:
         print('   Action:', name)
-        fmt = inspect.formatargspec(*arg_spec)[1:-1]
         if fmt:
             print('Arguments:', fmt)
-        lines = [x.strip() for x in method.__doc__.strip().splitlines()]
         print('           ' + '\n           '.join(lines))
         print()
 
 
 def execute_action(manager, argv):
     method_name = argv.pop(0).lower()
-    method_dict = dict((k.lower(), v) for (k, v) in inspect.getmembers(manager)
-                       if inspect.ismethod(v))
+    real_name = manager._get_cli_action_index().get(method_name)
 
-    try:
-        method = method_dict[method_name]
-    except KeyError:
+    if real_name is None:
         raise ArgumentsError('%r is not a valid action.' % (method_name,))
 
-    pos_args = []
+    method = getattr(manager, real_name)
+
+    pos_args = [None] * len(argv)
+    pos_count = 0
     kw_args = {}
+    kw_set = kw_args.__setitem__
     process_kw = True
 
     for arg in argv:
-        if process_kw and arg == '--':
-            process_kw = False  # stop -- processing.
-        elif process_kw and arg[:2] == '--' and '=' in arg:
-            key, val = arg[2:].split('=', 2)
-            kw_args[key] = val
-        else:
-            pos_args.append(arg)
+        if process_kw:
+            if arg == '--':
+                process_kw = False  # stop -- processing.
+                continue
+
+            if arg.startswith('--'):
+                key, sep, val = arg[2:].partition('=')
+                if sep:
+                    kw_set(key, val)
+                    continue
+
+        pos_args[pos_count] = arg
+        pos_count += 1
 
+    del pos_args[pos_count:]
+
+    import Asterisk.Util
     Asterisk.Util.dump_human(method(*pos_args, **kw_args))
 
 
@@ -123,6 +184,9 @@ def command_line(argv):
     if command == 'usage':
         return usage(argv[0], sys.stdout)
 
+    from Asterisk import Config
+    from Asterisk import Manager
+
     manager = Manager.Manager(*Config.Config().get_connection())
 
     if command == 'actions':
@@ -145,4 +209,4 @@ def command_line(argv):
             show_actions(argv[2])
 
     elif command == 'command':
-        execute_action('command', [argv[2]])
+        execute_action(manager, ['command', argv[2]])
@@ -6,13 +6,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
-import os, sys
-
-#configparser has changed
-try:
-    import configparser
-except:
-    import ConfigParser as configparser
+import configparser
+import os, stat, sys
 
 import Asterisk
 
@@ -20,14 +15,67 @@ import Asterisk
 
 CONFIG_FILENAME = 'py-asterisk.conf'
 
-CONFIG_PATHNAMES = [
-    os.environ.get('PYASTERISK_CONF', ''),
-    os.path.join(os.environ.get('HOME', ''), '.py-asterisk.conf'),
-    os.path.join(os.environ.get('USERPROFILE', ''), 'py-asterisk.conf'),
-    'py-asterisk.conf',
-    '/etc/py-asterisk.conf',
-    '/etc/asterisk/py-asterisk.conf',
-]
+
+def _build_config_pathnames():
+    '''
+    Return the configuration file search path, skipping entries that depend
+    on unset or empty environment variables.
+    '''
+
+    pathnames = []
+    environ = os.environ
+
+    if environ.get('PYASTERISK_CONF'):
+        pathnames.append(environ['PYASTERISK_CONF'])
+    if environ.get('HOME'):
+        pathnames.append(os.path.join(environ['HOME'], '.py-asterisk.conf'))
+    if environ.get('USERPROFILE'):
+        pathnames.append(os.path.join(environ['USERPROFILE'], CONFIG_FILENAME))
+
+    pathnames.extend((
+        CONFIG_FILENAME,
+        '/etc/py-asterisk.conf',
+        '/etc/asterisk/py-asterisk.conf',
+    ))
+    return tuple(pathnames)
+
+
+CONFIG_PATHNAMES = _build_config_pathnames()
+
+# Parsed configuration files, keyed by pathname. Each entry is a
+# ((st_mtime_ns, st_size), sections) tuple, reused while the file is
+# unchanged. sections is a snapshot of the parsed file as accepted by
+# ConfigParser.read_dict(); it is never modified, and every Config gets a
+# parser of its own built from it.
+_CONFIG_CACHE = {}
+
+# Pathname found by the last search of CONFIG_PATHNAMES, and the candidates
+# that search skipped because they did not exist.
+_found_pathname = None
+_missing_pathnames = set()
+
+
+def _snapshot(conf):
+    'Return the raw values of ConfigParser <conf> as read_dict() input.'
+
+    defaults = conf.defaults()
+    sections = {conf.default_section: dict(defaults)}
+
+    for section in conf.sections():
+        sections[section] = {
+            key: value for key, value in conf.items(section, raw=True)
+            if key not in defaults or defaults[key] != value}
+
+    return sections
+
+
+def _is_regular_file(pathname):
+    'Return truth if <pathname> names an existing regular file.'
+
+    try:
+        return stat.S_ISREG(os.stat(pathname).st_mode)
+    except OSError:
+        return False
 
 
 class ConfigurationError(Asterisk.BaseException):
@@ -45,11 +93,29 @@ class Config(object):
         is not None.
         '''
 
+        global _found_pathname
+
         if config_pathname is None:
+            if _found_pathname is not None and \
+                    _is_regular_file(_found_pathname):
+                return _found_pathname
+
+            missing = []
+
             for pathname in CONFIG_PATHNAMES:
-                if os.path.exists(pathname):
-                    config_pathname = pathname
+                if pathname in _missing_pathnames:
+                    continue
+                if _is_regular_file(pathname):
+                    config_pathname = _found_pathname = pathname
                     break
+                missing.append(pathname)
+
+            # Only remember misses shadowed by a successful search, so a
+            # failed search probes every candidate again next time.
+            if config_pathname is None:
+                _missing_pathnames.clear()
+            else:
+                _missing_pathnames.update(missing)
 
         if config_pathname is None:
             raise ConfigurationError(
@@ -57,17 +123,42 @@ class Config(object):
 
         return config_pathname
 
+    @classmethod
+    def invalidate_cache(cls):
+        '''
+        Forget previously located and parsed configuration files, so the next
+        Config instance searches CONFIG_PATHNAMES and parses its file again.
+        '''
+
+        global _found_pathname
+
+        _found_pathname = None
+        _missing_pathnames.clear()
+        _CONFIG_CACHE.clear()
+
     def refresh(self):
         'Read py-Asterisk configuration data from the filesystem.'
 
+        st = os.stat(self.config_pathname)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _CONFIG_CACHE.get(self.config_pathname)
+
+        if cached is not None and cached[0] == stamp:
+            self.conf = configparser.ConfigParser()
+            self.conf.read_dict(cached[1])
+            return
+
         try:
-            self.conf = configparser.SafeConfigParser()
-            self.conf.readfp(open(self.config_pathname))
+            self.conf = configparser.ConfigParser()
+            with open(self.config_pathname) as config_file:
+                self.conf.read_file(config_file)
 
         except configparser.Error as e:
             raise ConfigurationError('%r contains invalid data at line %r' %
                                      (self.config_pathname, e.lineno))
 
+        _CONFIG_CACHE[self.config_pathname] = (stamp, _snapshot(self.conf))
+
     def __init__(self, config_pathname=None):
         config_pathname = self._find_config(config_pathname)
 
@@ -90,15 +181,16 @@ class Config(object):
             if connection is None:
                 connection = conf.get('py-asterisk', 'default connection')
 
-            items = dict(conf.items('connection: ' + connection))
+            section = 'connection: ' + connection
+            address = (conf.get(section, 'hostname'),
+                       conf.getint(section, 'port'))
+            username = conf.get(section, 'username')
+            secret = conf.get(section, 'secret')
 
         except configparser.Error as e:
             raise ConfigurationError(str(e))
 
-        try:
-            address = (items['hostname'], int(items['port']))
-
         except ValueError:
             raise ConfigurationError('The port number specified is not valid.')
 
-        return (address, items['username'], items['secret'])
\ No newline at end of file
+        return (address, username, secret)
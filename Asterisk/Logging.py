@@ -3,6 +3,7 @@ Asterisk/Logging.py: extensions to the Python 2.3 logging module.
 '''
 
 from __future__ import absolute_import
+import functools
 import logging
 
 __author__ = 'David Wilson'
@@ -19,6 +20,10 @@ logging.addLevelName(logging.STATE, 'STATE')
 logging.addLevelName(logging.PACKET, 'PACKET')
 logging.addLevelName(logging.IO, 'IO')
 
+_STATE = logging.STATE
+_PACKET = logging.PACKET
+_IO = logging.IO
+
 # Attempt to find the parent logger class using the Python 2.4 API.
 
 if hasattr(logging, 'getLoggerClass'):
@@ -32,15 +37,18 @@ else:
 class AsteriskLogger(loggerClass):
     def state(self, msg, *args, **kwargs):
         "Log a message with severity 'STATE' on this logger."
-        return self.log(logging.STATE, msg, *args, **kwargs)
+        if self.isEnabledFor(_STATE):
+            self._log(_STATE, msg, args, **kwargs)
 
     def packet(self, msg, *args, **kwargs):
         "Log a message with severity 'PACKET' on this logger."
-        return self.log(logging.PACKET, msg, *args, **kwargs)
+        if self.isEnabledFor(_PACKET):
+            self._log(_PACKET, msg, args, **kwargs)
 
     def io(self, msg, *args, **kwargs):
         "Log a message with severity 'IO' on this logger."
-        return self.log(logging.IO, msg, *args, **kwargs)
+        if self.isEnabledFor(_IO):
+            self._log(_IO, msg, args, **kwargs)
 
 
 # Install the new system-wide logger class.
@@ -48,15 +56,38 @@ class AsteriskLogger(loggerClass):
 logging.setLoggerClass(AsteriskLogger)
 
 
+# Loggers are never destroyed, so lookups by name can be memoized without
+# taking the logging module lock.
+
+_get_logger = functools.lru_cache(maxsize=1024)(logging.getLogger)
+
+
 # Per-instance logging mix-in.
 
 class InstanceLogger(object):
+    # No instance state of its own; lets subclasses define __slots__.
+    __slots__ = ()
+
+    # Set per subclass by __init_subclass__(); _logger is None when the
+    # subclass overrides getLoggerName(), which is then called per instance.
+    _logger_name = '%s.InstanceLogger' % (__name__,)
+    _logger = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._logger_name = '%s.%s' % (cls.__module__, cls.__name__)
+
+        if cls.getLoggerName is InstanceLogger.getLoggerName:
+            cls._logger = _get_logger(cls._logger_name)
+        else:
+            cls._logger = None
+
     def getLoggerName(self):
         '''
         Return the name where log messages for this instance is sent.
         '''
 
-        return '%s.%s' % (self.__module__, self.__class__.__name__)
+        return self._logger_name
 
     def getLogger(self):
         '''
@@ -64,4 +95,15 @@ class InstanceLogger(object):
         instance.
         '''
 
-        return logging.getLogger(self.getLoggerName())
+        log = self._logger
+
+        if log is not None:
+            return log
+
+        try:
+            return self.__dict__['_log']
+        except KeyError:
+            log = self.__dict__['_log'] = _get_logger(self.getLoggerName())
+            return log
+        except AttributeError:  # __slots__ class without a __dict__.
+            return _get_logger(self.getLoggerName())
@@ -4,10 +4,20 @@ Asterisk Manager and Channel objects.
 '''
 from __future__ import absolute_import
 
-import datetime
+import asyncio
+import builtins
+import contextlib
+import logging
+import queue
 import re
+import select
+import selectors
 import socket
+import sys
+import threading
 import time
+import types
+import weakref
 
 import Asterisk
 import Asterisk.Util
@@ -19,6 +29,160 @@ __id__ = '$Id$'
 
 # pylint: disable=W0710, W0622
 
+_FOLLOWS_LINE = b'Response: Follows\r\n'
+_END_COMMAND = b'--END COMMAND--'
+_OK_RESPONSES = frozenset(('Success', 'Follows', 'Pong'))
+
+# Packet fields holding channel identifiers, see _translate_channels().
+_CHANNEL_KEYS = ('Channel', 'Channel1', 'Channel2')
+
+_HDR_ACTION = b'Action: '
+_HDR_ACTIONID = b'\r\nActionID: '
+_HDR_EVENT = b'Event: '
+_CRLF = b'\r\n'
+_CRLFCRLF = b'\r\n\r\n'
+
+# Encoded "Action: <name>\r\nActionID: " prefixes, by action name.
+_ACTION_PREFIXES = {}
+
+# Fields dropped from collected events: the event info, plus the fields the
+# collector's result is keyed on.
+_EVINFO_SKIP = frozenset(('ActionID', 'Event'))
+_STATUS_SKIP = frozenset(('ActionID', 'Event', 'Channel'))
+_QUEUE_SKIP = frozenset(('ActionID', 'Event', 'Queue'))
+_QUEUE_MEMBER_SKIP = _QUEUE_SKIP | {'Location'}
+_QUEUE_ENTRY_SKIP = _QUEUE_SKIP | {'Channel'}
+_PARKED_SKIP = frozenset(('ActionID', 'Event', 'Exten'))
+_REGISTRY_SKIP = frozenset(('ActionID', 'Event', 'Host'))
+_PEER_SKIP = frozenset(('ActionID', 'Event', 'ObjectName'))
+
+
+# Header names found in most packets. Parsed keys are swapped for these
+# interned copies, so packets share one string and its cached hash.
+_KNOWN_KEYS = {key: sys.intern(key) for key in (
+    'AccountCode', 'ActionID', 'Application', 'AppData', 'CallerID',
+    'CallerIDName', 'CallerIDNum', 'Calls', 'Channel', 'Channel1', 'Channel2',
+    'ChannelState', 'ChannelStateDesc', 'ConnectedLineName',
+    'ConnectedLineNum', 'Context', 'Data', 'Duration', 'Event', 'Exten',
+    'Extension', 'Host', 'IPaddress', 'IPport', 'Items', 'Language',
+    'Linkedid', 'Location', 'Max', 'MemberName', 'Membership', 'Message',
+    'Name', 'ObjectName', 'Paused', 'Penalty', 'Position', 'Priority',
+    'Privilege', 'Queue', 'Response', 'State', 'Status', 'Timeout',
+    'Uniqueid', 'Value', 'Variable')}
+
+# What bytes.rstrip() strips; str.rstrip() would also strip e.g. U+00A0.
+_WHITESPACE = ' \t\n\r\x0b\x0c'
+
+# One plain "Key: value" (or empty "Key:") header line. Lines it does not
+# match are left to the line-by-line parser in _next_packet().
+_HEADER_RE = re.compile(r'^([^ :\n][^:\n]*):(?: (.*?))?[ \t\r\x0b\x0c]*$',
+                        re.M)
+
+
+# Actions answered by a list of events: the event ending the list, and the
+# names of the events collected from it. See _collect().
+_COLLECTED_EVENTS = {
+    'CoreShowChannels': ('CoreShowChannelsComplete', ('CoreShowChannel',)),
+    'ParkedCalls': ('ParkedCallsComplete', ('ParkedCall',)),
+    'QueueStatus': ('QueueStatusComplete',
+                    ('QueueParams', 'QueueMember', 'QueueEntry')),
+    'SIPpeers': ('PeerlistComplete', ('PeerEntry',)),
+    'SIPshowregistry': ('RegistrationsComplete', ('RegistryEntry',)),
+    'Status': ('StatusComplete', ('Status',)),
+    'ZapShowChannels': ('ZapShowChannelsComplete', ('ZapShowChannels',)),
+}
+
+
+def _collect(manager, action):
+    '''
+    Send <action> through <manager>, and return a list of the events that
+    follow its response for each event name listed for it in
+    _COLLECTED_EVENTS.
+    '''
+
+    complete, names = _COLLECTED_EVENTS[action]
+
+    id = manager._write_action(action)
+    manager._translate_response(manager.read_response(id))
+
+    lists = tuple([] for name in names)
+    manager._drain_until(complete, {
+        name: events.append for name, events in zip(names, lists)})
+    return lists
+
+
+def _strip_fields(event, skip):
+    'Return a copy of <event> without the fields named in the set <skip>.'
+
+    return Asterisk.Util.AttributeDict(
+        [(key, value) for key, value in event.items() if key not in skip])
+
+
+def _decode(data):
+    '''
+    Decode bytes received from the PBX as UTF-8, falling back to latin-1 for
+    just the lines that are not valid UTF-8.
+    '''
+
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return '\n'.join([_decode_line(line) for line in data.split(b'\n')])
+
+
+def _decode_line(line):
+    'Decode one line received from the PBX, falling back to latin-1.'
+
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError:
+        return line.decode('latin1')
+
+
+def _parse_headers(text, log=None):
+    '''
+    Parse the decoded header lines <text> of one packet, without its
+    terminating blank line, into an AttributeDict. If <log> is not None, log
+    each line to it at IO level.
+    '''
+
+    packet = Asterisk.Util.AttributeDict()
+
+    # Parse all lines in one regex scan when every line is a plain header;
+    # otherwise (or to log each line) go line by line.
+    pairs = None if log is not None else _HEADER_RE.findall(text)
+
+    known = _KNOWN_KEYS
+
+    if pairs is not None and len(pairs) == text.count('\n') + 1:
+        for key, val in pairs:
+            packet[known.get(key, key)] = val
+        return packet
+
+    for line in text.split('\n'):
+        line = line.rstrip(_WHITESPACE)
+        if log is not None:
+            log.io('_read_packet: recv %r', line)
+
+        sep = line.find(':')
+        if sep == len(line) - 1:  # Empty field:
+            key, val = line[:-1], ''
+        elif line[:1] == ' ' and line.count(',') == 1:  # ChannelVariable
+            key, _, val = line[1:].partition(',')
+        else:
+            if line[sep + 1:sep + 2] != ' ':
+                sep = line.find(': ')
+            # Some asterisk features like 'XMPP' presence
+            # send bogus packets with empty lines in the datas
+            # We should properly fail on those packets.
+            if sep < 0:
+                raise InternalError('Malformed packet detected: %r' % packet)
+            key, val = line[:sep], line[sep + 2:]
+
+        packet[known.get(key, key)] = val
+
+    return packet
+
 # Your ParentBaseException class should provide a __str__ method that combined
 # _prefix and _error as  ('%s: %s' % (_prefix, _error) or similar.
 
@@ -40,6 +204,13 @@ class CommunicationError(BaseException):
         self._error = e + ': %r' % (packet,)
 
 
+class ResponseTimeout(BaseException):
+    '''
+    This exception is raised when the PBX does not respond to an action within
+    the time allowed.
+    '''
+
+
 class GoneAwayError(BaseException):
     'This exception is raised when the Manager connection becomes closed.'
 
@@ -70,6 +241,10 @@ class BaseChannel(Asterisk.Logging.InstanceLogger):
     This translates to Getvar and Setvar actions on the channel.
     '''
 
+    # One channel object exists per channel seen in packets; keep them small.
+    # __weakref__ is needed by the manager's channel cache.
+    __slots__ = ('manager', 'id', 'log', '__weakref__')
+
     def __init__(self, manager, id):
         '''
         Initialise a new Channel object belonging to <id> reachable via
@@ -159,6 +334,8 @@ class BaseChannel(Asterisk.Logging.InstanceLogger):
 
 
 class ZapChannel(BaseChannel):
+    __slots__ = ()
+
     def ZapDNDoff(self):
         'Disable DND status on this Zapata driver channel.'
         return self.manager.ZapDNDoff(self)
@@ -180,17 +357,24 @@ class ZapChannel(BaseChannel):
         return self.manager.ZapTransfer(self)
 
 
-class BaseManager(Asterisk.Logging.InstanceLogger):
-    'Base protocol implementation for the Asterisk Manager API.'
+class _BaseProtocol(Asterisk.Logging.InstanceLogger):
+    '''
+    State and packet handling shared by BaseManager and AsyncBaseManager:
+    formatting requests, cutting packets out of the receive buffer, and
+    translating and dispatching what was received. Reading from and writing
+    to the connection is left to the subclasses.
+    '''
 
     _AST_BANNER_PREFIX = 'Asterisk Call Manager'
+    _READ_BUFFER_SIZE = 65536
+    _SO_RCVBUF = 1 << 20
 
     def __init__(self, address, username, secret, listen_events=True,
                  timeout=None):
         '''
-        Provide communication methods for the PBX instance running at
-        <address>. Authenticate using <username> and <secret>. Receive event
-        information from the Manager API if <listen_events> is True.
+        Hold the settings for talking to the PBX instance running at
+        <address>, authenticating using <username> and <secret>, and set up
+        the state shared by both managers. No connection is made.
         '''
 
         self.address = address
@@ -204,32 +388,281 @@ class BaseManager(Asterisk.Logging.InstanceLogger):
         self.log = self.getLogger()
         self.log.debug('Initialising.')
 
+        # Packets are cut out of _rxbuf as data is received; _rxscan is the
+        # offset up to which _rxbuf is known not to contain a packet
+        # terminator.
+        self._rxbuf = bytearray()
+        self._rxscan = 0
+
+        self._action_counter = 0
+        self._channel_cache = weakref.WeakValueDictionary()
+        self._write_lock = threading.Lock()
+
+    def get_channel(self, channel_id):
+        '''
+        Return a channel object for the given <channel_id>. The same object is
+        returned for as long as something else holds a reference to it.
+        '''
+
+        channel = self._channel_cache.get(channel_id)
+
+        if channel is None:
+            if channel_id[:3].lower() == 'zap':
+                channel = ZapChannel(self, channel_id)
+            else:
+                channel = BaseChannel(self, channel_id)
+            self._channel_cache[channel_id] = channel
+
+        return channel
+
+    def __repr__(self):
+        'Return a string representation of this object.'
+
+        return '<%s.%s connected as %s to %s:%d>' %\
+            ((self.__module__, self.__class__.__name__,
+              self.username) + self.address)
+
+    def _format_action(self, action, data=None):
+        '''
+        Allocate an action identifier and encode an <action> request with the
+        headers from <data>. Return the identifier and the encoded request.
+        '''
+
+        # "+=" is not atomic; two threads must never share an ActionID.
+        with self._write_lock:
+            self._action_counter += 1
+            id = str(self._action_counter)
+
+        prefix = _ACTION_PREFIXES.get(action)
+        if prefix is None:
+            prefix = _HDR_ACTION + action.encode() + _HDR_ACTIONID
+            _ACTION_PREFIXES[action] = prefix
+
+        if not data:
+            payload = prefix + id.encode() + _CRLFCRLF
+
+        else:
+            headers = ''.join([
+                '%s: %s\r\n' % (key, value)
+                for key, values in data.items() if values is not None
+                for value in (values if isinstance(values, list)
+                              else (values,))])
+            payload = b''.join((prefix, id.encode(), _CRLF,
+                                headers.encode(), _CRLF))
+
+        return id, payload
+
+    def _read_response_follows(self, end):
+        '''
+        Parse and consume the first <end> bytes of the receive buffer, holding
+        a packet in the format sent by the "command" action.
+        '''
+        self.log.debug('In _read_response_follows().')
+        lines = []
+        packet = Asterisk.Util.AttributeDict({
+            'Response': 'Follows', 'Lines': lines
+        })
+
+        data = self._rxbuf[:end]
+        del self._rxbuf[:end]
+        self._rxscan = 0
+
+        # Look the levels up once per packet rather than once per line.
+        log_io = self.log.isEnabledFor(logging.IO)
+        log_debug = self.log.isEnabledFor(logging.DEBUG)
+
+        # Skip the "Response: Follows" line, the final line is the terminator.
+        for line_nr, line in enumerate(_decode(data).split('\n')[1:-1], 1):
+            line = line.rstrip(_WHITESPACE)
+            if log_io:
+                self.log.io('_read_response_follows: recv %r', line)
+            # In some case, ActionID is the line 2 the first starting with
+            # 'Privilege:'
+            if line_nr in [1, 2] and line.startswith('ActionID: '):
+                packet.ActionID = line[10:]
+            elif line == '--END COMMAND--':
+                self.log.debug('Completed _read_response_follows().')
+                return packet
+            elif not line:
+                if log_debug:
+                    self.log.debug('Empty line encountered.')
+            else:
+                lines.append(line)
+
+        return packet
+
+    def _next_packet(self):
+        '''
+        Parse and return the next complete packet held in the receive buffer,
+        or None if more data must be received first.
+        '''
+
+        buf = self._rxbuf
+
+        # Tolerate stray blank lines between packets.
+        if buf.startswith(b'\r\n'):
+            skip = len(buf) - len(buf.lstrip(b'\r\n'))
+            del buf[:skip]
+            self._rxscan = 0
+
+        if buf.startswith(_FOLLOWS_LINE):
+            # Only search the newly received data for the sentinel; _rxscan
+            # plays the same role as for ordinary packets below.
+            end = buf.find(_END_COMMAND, self._rxscan)
+            if end < 0:
+                self._rxscan = max(0, len(buf) - len(_END_COMMAND) + 1)
+                return None
+            # Consume the terminator line and the blank line after it.
+            self._rxscan = end
+            end = buf.find(b'\n', end)
+            end = buf.find(b'\n', end + 1) if end >= 0 else -1
+            if end < 0:
+                return None
+            return self._read_response_follows(end + 1)
+
+        if len(buf) < len(_FOLLOWS_LINE) and _FOLLOWS_LINE.startswith(buf):
+            return None
+
+        end = buf.find(b'\r\n\r\n', self._rxscan)
+
+        if end < 0:
+            self._rxscan = max(0, len(buf) - 3)
+            return None
+
+        data = buf[:end]
+        del buf[:end + 4]
+        self._rxscan = 0
+
+        log = self.log
+        packet = _parse_headers(_decode(data),
+                                log if log.isEnabledFor(logging.IO) else None)
+        log.packet('_read_packet: %r', packet)
+        return packet
+
+    def _default_event_path(self):
+        '''
+        Return truth if events only reach user code through self.events, ie.
+        neither on_Event() nor _translate_event() is overridden, by the class
+        or on this instance. Events nobody subscribed to can then be dropped
+        unseen. This is checked per event, so hooks set at any time count.
+        '''
+
+        return getattr(self.on_Event, '__func__', None) is \
+            _BaseProtocol.on_Event and \
+            getattr(self._translate_event, '__func__', None) is \
+            _BaseProtocol._translate_event
+
+    def _translate_response(self, packet):
+        '''
+        Raise an error if the reponse packet reports failure. Convert any
+        channel identifiers to their equivalent objects using get_channel().
+        '''
+
+        self._translate_channels(packet)
+
+        if packet.Response in _OK_RESPONSES:
+            return packet
+
+        message = packet.get('Message')
+
+        if message == 'Permission denied':
+            raise PermissionDenied(message)
+
+        raise ActionFailed(message)
+
+    def _translate_event(self, event):
+        '''
+        Translate any objects discovered in <event> to Python types.
+        '''
+
+        self._translate_channels(event)
+
+    def _translate_channels(self, packet):
+        'Replace channel identifiers in <packet> with channel objects.'
+
+        for key in _CHANNEL_KEYS:
+            value = packet.get(key)
+            if value is not None:
+                packet[key] = self.get_channel(value)
+
+    def on_Event(self, event):
+        '''
+        Triggered when an event is received from the Manager. Events nobody
+        subscribed to in self.events are skipped unless this method or
+        _translate_event() is overridden, on the class or on the instance.
+        '''
+
+        self.events.fire(event['Event'], self, event)
+
+    def strip_evinfo(self, event):
+        '''
+        Given an event, remove it's ActionID and Event members.
+        '''
+
+        return _strip_fields(event, _EVINFO_SKIP)
+
+
+class BaseManager(_BaseProtocol):
+    'Base protocol implementation for the Asterisk Manager API.'
+
+    def __init__(self, address, username, secret, listen_events=True,
+                 timeout=None):
+        '''
+        Provide communication methods for the PBX instance running at
+        <address>. Authenticate using <username> and <secret>. Receive event
+        information from the Manager API if <listen_events> is True.
+        '''
+
+        super().__init__(address, username, secret, listen_events, timeout)
+
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(self.timeout)
+        # Actions are small request/response exchanges, so don't let Nagle
+        # hold them back; event bursts get a roomier receive buffer. Keepalive
+        # lets a dead peer surface as GoneAwayError on an idle connection.
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._SO_RCVBUF)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         sock.connect(address)
 
-        self.file = sock.makefile('rwb', 0)  # unbuffered
-        self.fileno = self.file.fileno
+        # Writes go straight to the socket. Reads are received in bulk into
+        # _rxbuf and packets are cut out of it. No file object wraps the
+        # socket.
+        self._sock = sock
+        self.fileno = sock.fileno
 
-        self.response_buffer = []
+        self._rxview = memoryview(bytearray(self._READ_BUFFER_SIZE))
+
+        self.response_buffer = {}
+        # ActionIDs whose read_response() timed out; their late responses are
+        # dropped instead of buffered.
+        self._timed_out = set()
+        self._rx_queue = None
+        self._batch_buf = None
         self._authenticate()
 
-    def get_channel(self, channel_id):
-        'Return a channel object for the given <channel_id>.'
+    @classmethod
+    def _get_cli_action_index(cls):
+        '''
+        Return a mapping of lowercased public method names to their real names
+        for this class, built on first use and cached on the class.
+        '''
+
+        index = cls.__dict__.get('_cli_action_index')
+
+        if index is None:
+            index = cls._cli_action_index = {
+                name.lower(): name
+                for klass in reversed(cls.__mro__)
+                for name, value in vars(klass).items()
+                if name[0] != '_' and callable(value)}
 
-        if channel_id[:3].lower() == 'zap':
-            return ZapChannel(self, channel_id)
-        return BaseChannel(self, channel_id)
+        return index
 
     def _authenticate(self):
         'Read the server banner and attempt to authenticate.'
 
-        banner = self.file.readline().rstrip()
-        for enc in ('utf-8', 'latin1'):
-            try:
-                banner = banner.decode(enc)
-            except:
-                pass
+        banner = _decode(self._readline().rstrip())
         if not banner.startswith(self._AST_BANNER_PREFIX):
             raise Exception('banner incorrect; got %r, expected prefix %r' %
                             (banner, self._AST_BANNER_PREFIX))
@@ -249,13 +682,6 @@ class BaseManager(Asterisk.Logging.InstanceLogger):
 
         self.log.debug('Authenticated as %r.', self.username)
 
-    def __repr__(self):
-        'Return a string representation of this object.'
-
-        return '<%s.%s connected as %s to %s:%d>' %\
-            ((self.__module__, self.__class__.__name__,
-              self.username) + self.address)
-
     def _write_action(self, action, data=None):
         '''
         Write an <action> request to the Manager API, sending header keys and
@@ -263,206 +689,333 @@ class BaseManager(Asterisk.Logging.InstanceLogger):
         on success. Values from <data> are omitted if they are None.
         '''
 
-        id = str(time.time())  # Assumes microsecond precision for reliability.
-        lines = ['Action: ' + action, 'ActionID: ' + id]
+        id, payload = self._format_action(action, data)
+        self.log.packet('_write_action: send %r', payload)
+        self._write(payload)
+        return id
 
-        if data is not None:
-            for item in data.items():
-                if item[1] is not None:
-                    if not isinstance(item[1], list):
-                        lines.append('%s: %s' % item)
-                    elif isinstance(item[1], list):
-                        for param in item[1]:
-                            lines.append('%s: %s' % (item[0], param))
+    def _write(self, payload):
+        '''
+        Send the encoded requests <payload>, or hold them back while batch()
+        is active.
+        '''
 
-        self.log.packet('write_action: %r', lines)
+        # sendall() may take several send() calls; keep frames whole when
+        # several threads write actions.
+        with self._write_lock:
+            if self._batch_buf is not None:
+                self._batch_buf += payload
+            else:
+                self._sock.sendall(payload)
 
-        for line in lines:
-            self.file.write(line.encode() + b'\r\n')
-            self.log.io('_write_action: send %r', line + '\r\n')
+    @contextlib.contextmanager
+    def batch(self):
+        '''
+        Hold back actions written inside a "with" block and send them all in
+        one write when it ends. Their responses are read as usual afterwards,
+        with read_response(). Waiting for a response inside the block sends
+        what is held back first, so every action method still works there,
+        but only bare _write_action() calls are coalesced.
+        '''
 
-        self.file.write(b'\r\n')
-        self.log.io('_write_action: send: %r', '\r\n')
-        return id
+        if self._batch_buf is not None:
+            yield self
+            return
+
+        self._batch_buf = bytearray()
+        try:
+            yield self
+        finally:
+            self._flush_batch(stop=True)
 
-    def _read_response_follows(self):
+    def _flush_batch(self, stop=False):
         '''
-        Continue reading the remainder of this packet, in the format sent by
-        the "command" action.
+        Send the actions held back by batch(). Stop batching if <stop> is
+        True.
         '''
-        self.log.debug('In _read_response_follows().')
-        lines = []
-        packet = Asterisk.Util.AttributeDict({
-            'Response': 'Follows', 'Lines': lines
-        })
-        line_nr = 0
-        empty_line_ts = None
+
+        with self._write_lock:
+            payload = self._batch_buf
+            self._batch_buf = None if stop else bytearray()
+            if payload:
+                self._sock.sendall(payload)
+
+    def _fill(self):
+        '''
+        Receive the next chunk of data from the PBX into the receive buffer.
+        Raise GoneAwayError if the connection was closed.
+        '''
+
+        count = self._sock.recv_into(self._rxview)
+
+        if not count:
+            raise GoneAwayError('Asterisk Manager connection has gone away.')
+
+        self._rxbuf += self._rxview[:count]
+
+    def _readline(self):
+        'Return the next line from the receive buffer, reading as needed.'
+
+        buf = self._rxbuf
+
         while True:
-            line = self.file.readline().rstrip()
-            for enc in ('utf-8', 'latin1'):
-                try:
-                    line = line.decode(enc)
-                except:
-                    pass
-            self.log.io('_read_response_follows: recv %r', line)
-            line_nr += 1
-            # In some case, ActionID is the line 2 the first starting with
-            # 'Privilege:'
-            if line_nr in [1, 2] and line.startswith('ActionID: '):
-                packet.ActionID = line[10:]
-            elif line == '--END COMMAND--':
-                self.file.readline()
-                self.log.debug('Completed _read_response_follows().')
-                return packet
+            end = buf.find(b'\n')
+            if end >= 0:
+                line = bytes(buf[:end + 1])
+                del buf[:end + 1]
+                self._rxscan = 0
+                return line
+            self._fill()
+
+    def _skip_events(self):
+        '''
+        Drop the complete Event packets at the start of the receive buffer
+        without decoding or parsing them.
+        '''
 
-            elif not line:
-                if self.timeout:
-                    now = datetime.datetime.now()
-                    if empty_line_ts is None:
-                        empty_line_ts = now
-                    else:
-                        if (now - empty_line_ts).seconds > self.timeout:
-                            self.log.debug("Bogus asterisk 'Command' answer.'")
-                            raise CommunicationError(
-                                packet, 'expected --END COMMAND--')
-                self.log.debug('Empty line encountered.')
+        buf = self._rxbuf
 
-            else:
-                lines.append(line)
+        while buf.startswith(_HDR_EVENT):
+            end = buf.find(_CRLFCRLF, self._rxscan)
+            if end < 0:
+                self._rxscan = max(0, len(buf) - 3)
+                return
+            del buf[:end + 4]
+            self._rxscan = 0
+            self.log.debug('_skip_events() discarded an event.')
 
-    def _read_packet(self, discard_events=False):
+    def _read_packet(self, discard_events=False, timeout=None):
         '''
         Read a set of packet from the Manager API, stopping when a "\r\n\r\n"
         sequence is read. Return the packet as a mapping.
 
         If <discard_events> is True, discard all Event packets and wait for a
         Response packet, this is used while closing down the channel.
+
+        If <timeout> is not None, return None if no packet is complete after
+        that many seconds.
         '''
 
-        packet = Asterisk.Util.AttributeDict()
         self.log.debug('In _read_packet().')
-        while True:
-            line = self.file.readline().rstrip()
-            for enc in ('utf-8', 'latin1'):
-                try:
-                    line = line.decode(enc)
-                except:
-                    pass
-            self.log.io('_read_packet: recv %r', line)
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
 
-            if not line:
-                if not packet:
-                    raise GoneAwayError(
-                        'Asterisk Manager connection has gone away.')
-
-                self.log.packet('_read_packet: %r', packet)
+        while True:
+            if discard_events:
+                self._skip_events()
 
-                if discard_events and 'Event' in packet:
-                    self.log.debug('_read_packet() discarding: %r.', packet)
-                    packet.clear()
-                    continue
+            packet = self._next_packet()
 
-                self.log.debug('_read_packet() completed.')
-                return packet
+            if packet is None:
+                if timeout is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not select.select(
+                            [self._sock], [], [], remaining)[0]:
+                        return None
+                self._fill()
+                continue
 
-            val = None
-            if line.count(':') == 1 and line[-1] == ':':  # Empty field:
-                key, val = line[:-1], ''
-            elif line.count(',') == 1 and line[0] == ' ':  # ChannelVariable
-                key, val = line[1:].split(',', 1)
-            else:
-                # Some asterisk features like 'XMPP' presence
-                # send bogus packets with empty lines in the datas
-                # We should properly fail on those packets.
-                try:
-                    key, val = line.split(': ', 1)
-                except:
-                    raise InternalError('Malformed packet detected: %r'
-                                        % packet)
-            if key == 'Response' and val == 'Follows':
-                return self._read_response_follows()
+            if discard_events and 'Event' in packet:
+                self.log.debug('_read_packet() discarding: %r.', packet)
+                continue
 
-            packet[key] = val
+            self.log.debug('_read_packet() completed.')
+            return packet
 
-    def _dispatch_packet(self, packet):
-        'Feed a single packet to an event handler.'
+    def _dispatch_packet(self, packet, handlers=None):
+        '''
+        Feed a single packet to an event handler. If <handlers> is given, it
+        maps event names to callables that are passed the event after
+        on_Event() has seen it.
+        '''
 
         if 'Response' in packet:
-            self.log.debug('_dispatch_packet() placed response in buffer.')
-            self.response_buffer.append(packet)
+            id = packet.get('ActionID')
+            if id is None:
+                # Nothing can ever read_response() it; drop it.
+                self.log.debug('_dispatch_packet() dropping %r.', packet)
+            else:
+                self._buffer_response(id, packet)
 
         elif 'Event' in packet:
+            name = packet['Event']
+            handler = handlers.get(name) if handlers else None
+
+            if handler is None and \
+                    not self.events.subscriptions.get(name) and \
+                    self._default_event_path():
+                # Nobody would see it; skip translating and firing it.
+                return
+
             self._translate_event(packet)
             self.log.debug('_dispatch_packet() passing event to on_Event.')
             self.on_Event(packet)
 
+            if handler is not None:
+                handler(packet)
+
         else:
             raise InternalError('Unknown packet type detected: %r' % (packet,))
 
-    def _translate_response(self, packet):
+    def close(self):
+        'Log off and close the connection to the PBX.'
+
+        self.log.debug('Closing down.')
+
+        self._write_action('Logoff')
+        packet = self._read_packet(discard_events=True)
+        if packet.Response != 'Goodbye':
+            raise CommunicationError(packet, 'expected goodbye')
+
+        if self._rx_queue is not None:
+            # Wake the reader thread out of recv().
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._sock.close()
+
+    def start_reader(self, maxsize=1024):
         '''
-        Raise an error if the reponse packet reports failure. Convert any
-        channel identifiers to their equivalent objects using get_channel().
+        Receive and parse packets on a separate daemon thread, queueing up to
+        <maxsize> of them for dispatch by the calling thread, so that a slow
+        event handler does not hold up reading from the PBX. Afterwards, drive
+        the connection with serve_forever() and the action methods; read() is
+        for use with select() only.
         '''
 
-        for key in ('Channel', 'Channel1', 'Channel2'):
-            if key in packet:
-                packet[key] = self.get_channel(packet[key])
+        if self._rx_queue is not None:
+            raise InternalError('reader thread already started.')
 
-        if packet.Response in ('Success', 'Follows', 'Pong'):
-            return packet
+        self._rx_queue = queue.Queue(maxsize)
+        thread = threading.Thread(target=self._reader_loop,
+                                  args=(self._read_packet,),
+                                  name='%r reader' % (self,))
+        thread.daemon = True
 
-        if packet.Message == 'Permission denied':
-            raise PermissionDenied(packet.Message)
+        # From now on, packets are taken from the queue.
+        self._read_packet = self._read_queued_packet
+        thread.start()
 
-        raise ActionFailed(packet.Message)
+    def _reader_loop(self, read_packet):
+        '''
+        Body of the reader thread: queue each packet returned by
+        <read_packet>, or the exception that stopped it.
+        '''
 
-    def _translate_event(self, event):
+        put = self._rx_queue.put
+
+        while True:
+            try:
+                packet = read_packet()
+            except socket.timeout:
+                continue
+            except Exception as e:  # pylint: disable=W0703
+                self.log.debug('_reader_loop() stopping: %r.', e)
+                put(e)
+                return
+            put(packet)
+
+    def _read_queued_packet(self, discard_events=False, timeout=None):
         '''
-        Translate any objects discovered in <event> to Python types.
+        Take the next packet queued by the reader thread; see _read_packet()
+        for <discard_events> and <timeout>. Raise the error that stopped the
+        reader thread, if any.
         '''
 
-        for key in ('Channel', 'Channel1', 'Channel2'):
-            if key in event:
-                event[key] = self.get_channel(event[key])
+        get = self._rx_queue.get
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
 
-    def close(self):
-        'Log off and close the connection to the PBX.'
+        while True:
+            if timeout is None:
+                packet = get()
+            else:
+                try:
+                    packet = get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    return None
 
-        self.log.debug('Closing down.')
+            if isinstance(packet, Exception):
+                # Leave it queued for any later caller.
+                self._rx_queue.put(packet)
+                raise packet
 
-        self._write_action('Logoff')
-        packet = self._read_packet(discard_events=True)
-        if packet.Response != 'Goodbye':
-            raise CommunicationError(packet, 'expected goodbye')
-        self.file.close()
+            if discard_events and 'Event' in packet:
+                self.log.debug('_read_packet() discarding: %r.', packet)
+                continue
+
+            return packet
+
+    def register(self, selector, data=None):
+        '''
+        Register this connection for read events with the selectors.Selector
+        <selector>, attaching <data> (by default, this manager) to its key.
+        Call read() whenever the selector reports the connection readable.
+        '''
+
+        if data is None:
+            data = self
+        return selector.register(self._sock, selectors.EVENT_READ, data)
 
     def read(self):
-        'Called by the parent code when activity is detected on our fd.'
+        '''
+        Called by the parent code when activity is detected on our fd. Receive
+        what is available and dispatch every complete packet, including any
+        already buffered, since buffered data will not make the fd readable
+        again. A partial packet is kept for the next call, so this does not
+        block waiting for the rest of it.
+        '''
 
         self.log.io('read(): Activity detected on our fd.')
-        packet = self._read_packet()
-        self._dispatch_packet(packet)
+        if self._rx_queue is not None:
+            raise InternalError('read() is not used with the reader thread.')
+
+        next_packet = self._next_packet
+        dispatch = self._dispatch_packet
+
+        self._fill()
+        packet = next_packet()
 
-    def read_response(self, id):
-        'Return the response packet found for the given action <id>.'
+        while packet is not None:
+            dispatch(packet)
+            packet = next_packet()
+
+    def read_response(self, id, timeout=None):
+        '''
+        Return the response packet found for the given action <id>. If
+        <timeout> is not None, raise ResponseTimeout if it has not arrived
+        after that many seconds.
+        '''
 
         buffer = self.response_buffer
+        read_packet = self._read_packet
+        dispatch = self._dispatch_packet
 
-        while True:
-            if buffer:
-                for idx, packet in enumerate(buffer):
-                    # It is an error if no ActionID is sent.
-                    # This is intentional.
-                    if packet.ActionID == id:
-                        buffer.pop(idx)
-                        packet.pop('ActionID')
-                        return packet
+        packet = buffer.pop(id, None)
+        if packet is not None:
+            packet.pop('ActionID')
+            return packet
 
-            packet = self._read_packet()
+        if self._batch_buf:
+            self._flush_batch()
+
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            if timeout is None:
+                packet = read_packet()
+            else:
+                packet = read_packet(
+                    timeout=max(0, deadline - time.monotonic()))
+                if packet is None:
+                    self._timed_out.add(id)
+                    raise ResponseTimeout('no response to action %s after '
+                                          '%s seconds.' % (id, timeout))
 
             if 'Event' in packet:
-                self._dispatch_packet(packet)
+                dispatch(packet)
 
             elif 'ActionID' not in packet:
                 raise CommunicationError(packet, 'no ActionID')
@@ -472,12 +1025,20 @@ class BaseManager(Asterisk.Logging.InstanceLogger):
                 return packet
 
             else:
-                buffer.append(packet)
+                self._buffer_response(packet.ActionID, packet)
 
-    def on_Event(self, event):
-        'Triggered when an event is received from the Manager.'
+    def _buffer_response(self, id, packet):
+        '''
+        Keep the response <packet> to action <id> until read_response() asks
+        for it, or drop it if read_response() already gave up on <id>.
+        '''
 
-        self.events.fire(event.Event, self, event)
+        if id in self._timed_out:
+            self._timed_out.discard(id)
+            self.log.debug('Dropping late response %r.', packet)
+        else:
+            self.log.debug('Placed response in buffer.')
+            self.response_buffer[id] = packet
 
     def responses_waiting(self):
         'Return truth if there are unprocessed buffered responses.'
@@ -487,18 +1048,421 @@ class BaseManager(Asterisk.Logging.InstanceLogger):
     def serve_forever(self):
         'Handle one event at a time until doomsday.'
 
+        read_packet = self._read_packet
+        dispatch = self._dispatch_packet
+
         while True:
-            packet = self._read_packet()
-            self._dispatch_packet(packet)
+            dispatch(read_packet())
 
-    def strip_evinfo(self, event):
+    def pipeline(self):
         '''
-        Given an event, remove it's ActionID and Event members.
+        Return a Pipeline that queues actions of this manager and sends them
+        together, for use in a "with" statement.
+        '''
+
+        return Pipeline(self)
+
+    def _drain_until(self, complete, handlers=None):
+        '''
+        Read and dispatch packets until an event named <complete> has been
+        dispatched, passing <handlers> on to _dispatch_packet().
+        '''
+
+        read_packet = self._read_packet
+        dispatch = self._dispatch_packet
+
+        while True:
+            packet = read_packet()
+            dispatch(packet, handlers)
+            if packet.get('Event') == complete:
+                return
+
+
+class AsyncBaseManager(_BaseProtocol):
+    '''
+    Protocol implementation for the Asterisk Manager API running on an
+    asyncio event loop. Packets are parsed exactly as by BaseManager, but
+    actions are sent with the coroutine send_action(), and any number of them
+    may be awaited concurrently on the one connection. Events are dispatched
+    to on_Event() by a reader task as they arrive; actions answered by a list
+    of events are sent with the coroutine collect().
+
+    Use the coroutine connect() to open the connection and authenticate,
+    and the coroutine close() to log off. None of the blocking methods of
+    BaseManager are available.
+    '''
+
+    def __init__(self, address, username, secret, listen_events=True,
+                 timeout=None):
+        '''
+        Prepare to talk to the PBX instance running at <address>,
+        authenticating using <username> and <secret>. No connection is made
+        until connect() is awaited.
+        '''
+
+        super().__init__(address, username, secret, listen_events, timeout)
+
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+
+        # Futures of actions awaiting a response, by ActionID.
+        self._pending = {}
+        # (complete, handlers, future) of actions collecting events, by
+        # ActionID.
+        self._collecting = {}
+
+    async def connect(self):
+        '''
+        Connect to the PBX, read the server banner and authenticate. Return
+        this manager.
+        '''
+
+        host, port = self.address
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.timeout)
+
+        # asyncio already disables Nagle on TCP transports.
+        sock = self._writer.get_extra_info('socket')
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._SO_RCVBUF)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        banner = _decode((await self._reader.readline()).rstrip())
+        if not banner.startswith(self._AST_BANNER_PREFIX):
+            raise Exception('banner incorrect; got %r, expected prefix %r' %
+                            (banner, self._AST_BANNER_PREFIX))
+
+        self._reader_task = asyncio.get_running_loop().create_task(
+            self._read_task_loop())
+
+        action = {
+            'Username': self.username,
+            'Secret': self.secret
+        }
+
+        if not self.listen_events:
+            action['Events'] = 'off'
+
+        self.log.debug('Authenticating as %r/%r.', self.username, self.secret)
+        if (await self.send_action('Login', action)).Response == 'Error':
+            self._reader_task.cancel()
+            self._writer.close()
+            raise AuthenticationFailure('authentication failed.')
+
+        self.log.debug('Authenticated as %r.', self.username)
+        return self
+
+    async def _read_task_loop(self):
+        '''
+        Receive data from the PBX until the connection closes, resolving the
+        future of each response and dispatching each event.
+        '''
+
+        read = self._reader.read
+        next_packet = self._next_packet
+        pending = self._pending
+        collecting = self._collecting
+
+        try:
+            while True:
+                packet = next_packet()
+
+                if packet is None:
+                    data = await read(self._READ_BUFFER_SIZE)
+                    if not data:
+                        raise GoneAwayError('Asterisk Manager connection '
+                                            'has gone away.')
+                    self._rxbuf += data
+                    continue
+
+                if 'Response' in packet:
+                    future = pending.pop(packet.get('ActionID'), None)
+                    if future is None:
+                        self.log.debug('_read_task_loop() dropping %r.',
+                                       packet)
+                    elif not future.done():
+                        packet.pop('ActionID')
+                        future.set_result(packet)
+
+                elif 'Event' in packet:
+                    name = packet['Event']
+                    handler = None
+                    collection = collecting.get(packet.get('ActionID'))
+
+                    if collection is not None:
+                        complete, handlers, done = collection
+                        if name == complete:
+                            del collecting[packet['ActionID']]
+                            if not done.done():
+                                done.set_result(None)
+                        handler = handlers.get(name)
+
+                    if handler is None and \
+                            not self.events.subscriptions.get(name) and \
+                            self._default_event_path():
+                        continue
+                    self._translate_event(packet)
+                    self.on_Event(packet)
+
+                    if handler is not None:
+                        handler(packet)
+
+                else:
+                    raise InternalError('Unknown packet type detected: %r' %
+                                        (packet,))
+
+        except Exception as e:  # pylint: disable=W0703
+            # Nothing awaits this task; hand the error to every waiter.
+            self.log.debug('_read_task_loop() stopping: %r.', e)
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            pending.clear()
+            for complete, handlers, future in collecting.values():
+                if not future.done():
+                    future.set_exception(e)
+            collecting.clear()
+
+    async def send_action(self, action, data=None):
+        '''
+        Send an <action> request with the headers from the mapping <data>, and
+        return its response packet once it arrives.
+        '''
+
+        return await self._send_action(*self._format_action(action, data))
+
+    async def _send_action(self, id, payload):
+        '''
+        Send the request <payload> formatted by _format_action() with
+        ActionID <id>, and return its response packet once it arrives.
+        '''
+
+        if self._reader_task is None or self._reader_task.done():
+            raise GoneAwayError('Asterisk Manager connection has gone away.')
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[id] = future
+
+        try:
+            self.log.packet('send_action: send %r', payload)
+            self._writer.write(payload)
+            await self._writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            # Forget the action if it timed out, was cancelled or failed to
+            # send, so a late response is dropped rather than kept.
+            self._pending.pop(id, None)
+
+    async def collect(self, action, data=None):
+        '''
+        Send an <action> request answered by a list of events, such as
+        'Status' or 'QueueStatus', with the headers from the mapping <data>.
+        Once the list is complete, return one list of events for each event
+        name collected for <action> in _COLLECTED_EVENTS.
+        '''
+
+        complete, names = _COLLECTED_EVENTS[action]
+        lists = tuple([] for name in names)
+
+        id, payload = self._format_action(action, data)
+        done = asyncio.get_running_loop().create_future()
+        self._collecting[id] = (complete, {
+            name: events.append for name, events in zip(names, lists)}, done)
+
+        try:
+            self._translate_response(await self._send_action(id, payload))
+            await asyncio.wait_for(done, self.timeout)
+        finally:
+            self._collecting.pop(id, None)
+
+        return lists
+
+    async def close(self):
+        '''
+        Log off and close the connection to the PBX.
+        '''
+
+        self.log.debug('Closing down.')
+
+        try:
+            packet = await self.send_action('Logoff')
+            if packet.Response != 'Goodbye':
+                raise CommunicationError(packet, 'expected goodbye')
+        finally:
+            self._reader_task.cancel()
+            self._writer.close()
+            await self._writer.wait_closed()
+
+
+class _ActionQueued(builtins.BaseException):
+    '''
+    Raised to stop an action method once its request has been queued. Like
+    KeyboardInterrupt, it is not an Exception, so "except Exception" in an
+    action method cannot swallow it.
+    '''
+
+
+# BaseManager methods that write requests of their own, so pipelined actions
+# calling them must have those requests queued too; see _ActionProxy.
+_PROXIED_METHODS = frozenset(('close',))
+
+# BaseManager methods that read or serve the connection on their own, which
+# no pipelined action may call.
+_REFUSED_METHODS = frozenset((
+    'batch', 'pipeline', 'read', 'register', 'serve_forever', 'start_reader'))
+
+
+class _ActionProxy(object):
+    '''
+    Stand in for a manager while an action method runs, sending its request
+    through <write_action> instead of the manager's own _write_action().
+    Action methods, and the BaseManager methods in _PROXIED_METHODS, looked
+    up on the proxy are bound to it, so actions built on them are routed the
+    same way. Those in _REFUSED_METHODS raise InternalError; everything else
+    is the manager's.
+    '''
+
+    def __init__(self, manager, write_action):
+        self._manager = manager
+        self._write_action = write_action
+
+    def __getattr__(self, name):
+        value = getattr(type(self._manager), name, None)
+        if isinstance(value, types.FunctionType):
+            if name in _REFUSED_METHODS:
+                raise InternalError('%s() cannot be used by a pipelined '
+                                    'action.' % (name,))
+            if name in _PROXIED_METHODS or not hasattr(BaseManager, name):
+                return types.MethodType(value, self)
+        return getattr(self._manager, name)
+
+
+class PendingAction(object):
+    'The eventual return value of an action queued on a Pipeline.'
+
+    def __init__(self):
+        self._value = Asterisk.Util.Unspecified
+        self._error = None
+
+    def done(self):
+        'Return truth if the action has completed, successfully or not.'
+        return self._value is not Asterisk.Util.Unspecified or \
+            self._error is not None
+
+    def result(self):
+        '''
+        Return what the action method returned, or raise what it raised.
+        Raise InternalError if the pipeline has not been sent yet.
+        '''
+
+        if self._error is not None:
+            raise self._error
+        if self._value is Asterisk.Util.Unspecified:
+            raise InternalError('pipelined action has not completed.')
+        return self._value
+
+
+class Pipeline(object):
+    '''
+    Queue actions of a manager so their requests go out in one write, and
+    their responses are awaited together instead of one round trip at a
+    time:
+
+        with manager.pipeline() as pipe:
+            results = [pipe.Setvar(chan, 'FOO', 'bar') for chan in chans]
+
+        for result in results:
+            result.result()
+
+    Calling an action method on the pipeline returns a PendingAction. On
+    leaving the block the queued requests are sent, then each action method
+    completes in order, reading its response exactly as it would have done
+    unpipelined. Nothing is sent if the block raises. flush() sends the
+    actions queued so far without leaving the block.
+    '''
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._buffer = bytearray()
+        self._queued = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            del self._buffer[:], self._queued[:]
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(type(self.manager), name, None)
+        if not isinstance(method, types.FunctionType) or \
+                name[0] == '_' or hasattr(BaseManager, name):
+            raise AttributeError(name)
+
+        def queue_action(*args, **kwargs):
+            return self._queue(method, args, kwargs)
+
+        queue_action.__name__ = name
+        return queue_action
+
+    def _queue(self, method, args, kwargs):
         '''
+        Run <method> until it writes its request, appending the request to
+        the pipeline. Return the PendingAction for its eventual result.
+        '''
+
+        ids = []
+        pending = PendingAction()
+
+        def write_action(action, data=None):
+            id, payload = self.manager._format_action(action, data)
+            self._buffer += payload
+            ids.append(id)
+            raise _ActionQueued()
+
+        try:
+            pending._value = method(_ActionProxy(self.manager, write_action),
+                                    *args, **kwargs)
+        except _ActionQueued:
+            self._queued.append((method, args, kwargs, ids[0], pending))
+
+        return pending
+
+    def flush(self):
+        '''
+        Send every queued request in one write, then complete the queued
+        action methods in order. Return their PendingActions, in the order
+        they were queued.
+        '''
+
+        manager = self.manager
+        queued, self._queued = self._queued, []
+        payload, self._buffer = self._buffer, bytearray()
+
+        if not queued:
+            return []
 
-        new = event.copy()
-        del new['ActionID'], new['Event']
-        return new
+        manager.log.packet('Pipeline: send %r', payload)
+        manager._write(payload)
+
+        for method, args, kwargs, id, pending in queued:
+            ids = [id]
+
+            def write_action(action, data=None):
+                if ids:
+                    return ids.pop()
+                return manager._write_action(action, data)
+
+            try:
+                pending._value = method(_ActionProxy(manager, write_action),
+                                        *args, **kwargs)
+            except Exception as e:  # pylint: disable=W0703
+                pending._error = e
+
+        return [pending for method, args, kwargs, id, pending in queued]
 
 
 class CoreActions(object):  # pylint: disable=R0904
@@ -795,7 +1759,7 @@ class CoreActions(object):  # pylint: disable=R0904
             'Channel': channel,
             'File': pathname,
             'Format': format,
-            'Mix': mix and 'yes' or 'no'
+            'Mix': 'yes' if mix else 'no'
         })
 
         return self._translate_response(self.read_response(id))
@@ -807,7 +1771,7 @@ class CoreActions(object):  # pylint: disable=R0904
             'Channel': channel,
             'Direction': direction
             if direction in ['read', 'write'] else 'both',
-            'State': state and '1' or '0'
+            'State': '1' if state else '0'
         })
 
         return self._translate_response(self.read_response(id))
@@ -893,32 +1857,9 @@ class CoreActions(object):  # pylint: disable=R0904
     def ParkedCalls(self):
         'Return a nested dict describing currently parked calls.'
 
-        id = self._write_action('ParkedCalls')
-        self._translate_response(self.read_response(id))
-        parked = {}
-
-        def ParkedCall(self, event):
-            event = self.strip_evinfo(event)
-            parked[event.pop('Exten')] = event
-
-        def ParkedCallsComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection([ParkedCall,
-                                                ParkedCallsComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-
-        return parked
+        events, = _collect(self, 'ParkedCalls')
+        return {event['Exten']: _strip_fields(event, _PARKED_SKIP)
+                for event in events}
 
     def Ping(self):
         'No-op to ensure the PBX is still there and keep the connection alive.'
@@ -951,7 +1892,7 @@ class CoreActions(object):  # pylint: disable=R0904
         params = {
             'Queue': queue,
             'Interface': interface,
-            'Penalty': str(int(penalty))}
+            'Penalty': int(penalty)}
         if member_name:
             params['MemberName'] = member_name
         id = self._write_action('QueueAdd', params)
@@ -963,7 +1904,7 @@ class CoreActions(object):  # pylint: disable=R0904
         id = self._write_action('QueuePause', {
             'Queue': queue,
             'Interface': interface,
-            'Paused': paused and 'true' or 'false'
+            'Paused': 'true' if paused else 'false'
         })
 
         return self._translate_response(self.read_response(id))
@@ -981,41 +1922,22 @@ class CoreActions(object):  # pylint: disable=R0904
     def QueueStatus(self):
         'Return a complex nested dict describing queue statii.'
 
-        id = self._write_action('QueueStatus')
-        self._translate_response(self.read_response(id))
-        queues = {}
+        params, members, entries = _collect(self, 'QueueStatus')
 
-        def QueueParams(self, event):
-            queue = self.strip_evinfo(event)
+        queues = {}
+        for event in params:
+            queue = _strip_fields(event, _QUEUE_SKIP)
             queue['members'] = {}
             queue['entries'] = {}
-            queues[queue.pop('Queue')] = queue
-
-        def QueueMember(self, event):
-            member = self.strip_evinfo(event)
-            queues[member.pop('Queue')]['members'][
-                member.pop('Location')] = member
+            queues[event['Queue']] = queue
 
-        def QueueEntry(self, event):
-            entry = self.strip_evinfo(event)
-            queues[entry.pop('Queue')]['entries'][event.pop('Channel')] = entry
-
-        def QueueStatusComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection([
-            QueueParams, QueueMember, QueueEntry, QueueStatusComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
+        for event in members:
+            queues[event['Queue']]['members'][event['Location']] = \
+                _strip_fields(event, _QUEUE_MEMBER_SKIP)
 
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
+        for event in entries:
+            queues[event['Queue']]['entries'][event['Channel']] = \
+                _strip_fields(event, _QUEUE_ENTRY_SKIP)
 
         return queues
 
@@ -1044,7 +1966,7 @@ class CoreActions(object):  # pylint: disable=R0904
         id = self._write_action('SetCDRUserField', {
             'Channel': channel,
             'UserField': data,
-            'Append': append and 'yes' or 'no'
+            'Append': 'yes' if append else 'no'
         })
 
         return self._translate_response(self.read_response(id))
@@ -1070,90 +1992,23 @@ class CoreActions(object):  # pylint: disable=R0904
     def SipShowRegistry(self):
         'Return a nested dict of SIP registry.'
 
-        id = self._write_action('SIPshowregistry')
-        self._translate_response(self.read_response(id))
-        registry = {}
-
-        def RegistryEntry(self, event):
-            event = self.strip_evinfo(event)
-            name = event.pop('Host')
-            registry[name] = event
-
-        def RegistrationsComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection(
-            [RegistryEntry, RegistrationsComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-        return registry
+        events, = _collect(self, 'SIPshowregistry')
+        return {event['Host']: _strip_fields(event, _REGISTRY_SKIP)
+                for event in events}
 
     def SipPeers(self):
         'Return a nested dict of SIP peers.'
 
-        id = self._write_action('SIPpeers')
-        self._translate_response(self.read_response(id))
-        peer = {}
-
-        def PeerEntry(self, event):
-            event = self.strip_evinfo(event)
-            name = event.pop('ObjectName')
-            peer[name] = event
-
-        def PeerlistComplete(self, event):
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection([PeerEntry, PeerlistComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] == False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-        return peer
+        events, = _collect(self, 'SIPpeers')
+        return {event['ObjectName']: _strip_fields(event, _PEER_SKIP)
+                for event in events}
 
     def Status(self):
         'Return a nested dict of channel statii.'
 
-        id = self._write_action('Status')
-        self._translate_response(self.read_response(id))
-        channels = {}
-
-        def Status(self, event):
-            event = self.strip_evinfo(event)
-            name = event.pop('Channel')
-            channels[name] = event
-
-        def StatusComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection([Status, StatusComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-        return channels
+        events, = _collect(self, 'Status')
+        return {event['Channel']: _strip_fields(event, _STATUS_SKIP)
+                for event in events}
 
     def StopMonitor(self, channel):
         'Stop monitoring of <channel>.'
@@ -1164,31 +2019,7 @@ class CoreActions(object):  # pylint: disable=R0904
     def CoreShowChannels(self):
         'Return a list of current channels.'
 
-        id = self._write_action('CoreShowChannels')
-        self._translate_response(self.read_response(id))
-
-        channels = []
-
-        def CoreShowChannel(self, event):  # pylint: disable=W0613
-            channels.append(event)
-
-        def CoreShowChannelsComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
-
-        events = Asterisk.Util.EventCollection([
-            CoreShowChannel, CoreShowChannelsComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-
+        channels, = _collect(self, 'CoreShowChannels')
         return channels
 
 
@@ -1208,51 +2039,30 @@ class ZapataActions(object):
     def ZapDNDoff(self, channel):
         'Disable DND status on Zapata driver <channel>.'
 
-        id = self._write_action('ZapDNDoff', {'ZapChannel': str(int(channel))})
+        id = self._write_action('ZapDNDoff', {'ZapChannel': int(channel)})
         return self._translate_response(self.read_response(id))
 
     def ZapDNDon(self, channel):
         'Enable DND status on Zapata driver <channel>.'
 
-        id = self._write_action('ZapDNDon', {'ZapChannel': str(int(channel))})
+        id = self._write_action('ZapDNDon', {'ZapChannel': int(channel)})
         return self._translate_response(self.read_response(id))
 
     def ZapHangup(self, channel):
         'Hangup Zapata driver <channel>.'
 
-        id = self._write_action('ZapHangup', {'ZapChannel': str(int(channel))})
+        id = self._write_action('ZapHangup', {'ZapChannel': int(channel)})
         return self._translate_response(self.read_response(id))
 
     def ZapShowChannels(self):
         'Return a nested dict of Zapata driver channel statii.'
 
-        id = self._write_action('ZapShowChannels')
-        self._translate_response(self.read_response(id))
-        channels = {}
-
-        def ZapShowChannels(self, event):
-            event = self.strip_evinfo(event)
-            number = int(event.pop('Channel'))
-            channels[number] = event
-
-        def ZapShowChannelsComplete(self, event):  # pylint: disable=W0613
-            stop_flag[0] = True
+        events, = _collect(self, 'ZapShowChannels')
 
-        events = Asterisk.Util.EventCollection([
-            ZapShowChannels, ZapShowChannelsComplete])
-        self.events += events
-
-        try:
-            stop_flag = [False]
-
-            while stop_flag[0] is False:
-                packet = self._read_packet()
-                self._dispatch_packet(packet)
-
-        finally:
-            self.events -= events
-
-        return channels
+        # Channel was already turned into a channel object by
+        # _translate_event(); its id is the bare channel number.
+        return {int(event['Channel'].id): _strip_fields(event, _STATUS_SKIP)
+                for event in events}
 
     def ZapTransfer(self, channel):
         'Transfer Zapata driver <channel>.'
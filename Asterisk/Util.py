@@ -4,6 +4,7 @@ Asterisk/Util.py: utility classes.
 from __future__ import absolute_import
 
 
+import logging
 import sys
 
 import Asterisk
@@ -33,20 +34,26 @@ Unspecified = Unspecified()
 
 
 class AttributeDict(dict):
+    # Attributes are stored as items, so instances need no __dict__ of their
+    # own; one is allocated per packet and event.
+    __slots__ = ()
+
     # Fields that can have more that one ocurrency in the manager response
     # or event
-    MULTI_VALUE_FIELD = ('ChanVariable', 'DestChanVariable')
+    MULTI_VALUE_FIELD = frozenset(('ChanVariable', 'DestChanVariable'))
 
     def __setitem__(self, key, value):
         # Assign the multivalue fields correctly in the dictionary
-        if key in self.MULTI_VALUE_FIELD and '=' in value:
-            k, v = value.split('=')[:2]
-            if key in self:
-                self[key][k] = v
-            else:
-                super(AttributeDict, self).__setitem__(key, {k: v})
-        else:
-            super(AttributeDict, self).__setitem__(key, value)
+        if key in self.MULTI_VALUE_FIELD:
+            i = value.find('=')
+            if i >= 0:
+                fields = dict.get(self, key)
+                if fields is None:
+                    dict.__setitem__(self, key, {value[:i]: value[i + 1:]})
+                else:
+                    fields[value[:i]] = value[i + 1:]
+                return
+        dict.__setitem__(self, key, value)
 
     def __getattr__(self, key):
         return self[key]
@@ -55,7 +62,7 @@ class AttributeDict(dict):
         self[key] = value
 
     def copy(self):
-        return AttributeDict(iter(self.items()))
+        return AttributeDict(self)
 
 
 class EventCollection(Logging.InstanceLogger):
@@ -105,13 +112,20 @@ class EventCollection(Logging.InstanceLogger):
         returning the return value of the last called subscriber.
         '''
 
-        if name not in self.subscriptions:
+        subscriptions = self.subscriptions.get(name)
+        if not subscriptions:
             return
 
+        log = self.log if self.log.isEnabledFor(logging.DEBUG) else None
+
+        if log is None and len(subscriptions) == 1:
+            return subscriptions[0](*args, **kwargs)
+
         return_value = None
 
-        for subscription in self.subscriptions[name]:
-            self.log.debug('calling %r(*%r, **%r)', subscription, args, kwargs)
+        for subscription in subscriptions:
+            if log is not None:
+                log.debug('calling %r(*%r, **%r)', subscription, args, kwargs)
             return_value = subscription(*args, **kwargs)
 
         return return_value
@@ -124,20 +138,27 @@ class EventCollection(Logging.InstanceLogger):
             for subscription in subscriptions:
                 new.subscriptions[name].append(subscription)
 
+        return new
+
     def __iadd__(self, collection):
         'Add all the events in <collection> to our collection.'
 
         if not isinstance(collection, EventCollection):
             raise TypeError
 
-        new = self.copy()
+        added = []
 
         try:
             for name, handlers in collection.subscriptions.items():
                 for handler in handlers:
                     self.subscribe(name, handler)
+                    added.append((name, handler))
         except Exception:
-            self.subscriptions = new.subscriptions
+            for name, handler in reversed(added):
+                subscriptions = self.subscriptions[name]
+                subscriptions.remove(handler)
+                if not subscriptions:
+                    del self.subscriptions[name]
             raise
 
         return self
@@ -148,14 +169,17 @@ class EventCollection(Logging.InstanceLogger):
         if not isinstance(collection, EventCollection):
             raise TypeError
 
-        new = self.copy()
+        removed = []
 
         try:
             for name, handlers in collection.subscriptions.items():
                 for handler in handlers:
+                    index = self.subscriptions[name].index(handler)
                     self.unsubscribe(name, handler)
+                    removed.append((name, index, handler))
         except Exception:
-            self.subscriptions = new.subscriptions
+            for name, index, handler in reversed(removed):
+                self.subscriptions[name].insert(index, handler)
             raise
 
         return self
@@ -173,42 +197,70 @@ def dump_packet(packet, file=sys.stdout):
     else:
         file.write('-- Response: %s\n' % packet.pop('Response'))
 
-    packet = list(packet.items())
-    packet.sort()
-
-    for tuple in packet:
-        file.write('   %s: %s\n' % tuple)
+    for item in sorted(packet.items()):
+        file.write('   %s: %s\n' % item)
 
     file.write('\n')
 
 
 def dump_human(data, file=sys.stdout, _indent=0):
+    '''
+    Dump <data>, made of dicts, lists, tuples and scalars, in human readable
+    form to file-like object <file>.
+    '''
 
-    recursive = (dict, list, tuple, AttributeDict)
+    parts = []
+    _dump_human(data, parts, _indent)
+    file.write(''.join(parts))
 
-    def indent(a=0, i=_indent):
-        return '   ' * (a + i)
 
-    Type = type(data)
+def _dump_human(data, parts, _indent):
+    'Append the lines dump_human() writes for <data> to the list <parts>.'
 
-    if Type in (dict, AttributeDict):
-        items = list(data.items())
-        items.sort()
+    _DUMPERS.get(type(data), _dump_other)(data, parts, _indent)
 
-        for key, val in items:
-            file.write(indent() + str(key) + ': ')
-            if any(isinstance(val, type_) for type_ in recursive):
-                file.write('\n')
-                dump_human(val, file, _indent + 1)
-            else:
-                dump_human(val, file, 0)
 
-    elif Type in (list, tuple):
-        for val in data:
-            dump_human(val, file, _indent + 1)
+def _dump_mapping(data, parts, _indent):
+    indent = '   ' * _indent
 
-    elif Type in (int, float):
-        file.write(indent() + '%r\n' % data)
+    for key, val in sorted(data.items()):
+        parts += (indent, str(key), ': ')
+        if isinstance(val, (dict, list, tuple)):
+            parts.append('\n')
+            _dump_human(val, parts, _indent + 1)
+        else:
+            _dump_human(val, parts, 0)
+
+
+def _dump_sequence(data, parts, _indent):
+    for val in data:
+        _dump_human(val, parts, _indent + 1)
+
+
+def _dump_number(data, parts, _indent):
+    parts += ('   ' * _indent, repr(data), '\n')
 
-    elif Type is str:
-        file.write(indent() + data + '\n')
+
+def _dump_string(data, parts, _indent):
+    parts += ('   ' * _indent, str(data), '\n')
+
+
+def _dump_other(data, parts, _indent):
+    if isinstance(data, dict):
+        _dump_mapping(data, parts, _indent)
+    elif isinstance(data, (list, tuple)):
+        _dump_sequence(data, parts, _indent)
+    else:
+        _dump_string(data, parts, _indent)
+
+
+# dump_human() helpers by exact type; anything else goes to _dump_other().
+_DUMPERS = {
+    dict: _dump_mapping,
+    AttributeDict: _dump_mapping,
+    list: _dump_sequence,
+    tuple: _dump_sequence,
+    int: _dump_number,
+    float: _dump_number,
+    str: _dump_string,
+}
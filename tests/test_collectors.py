@@ -0,0 +1,205 @@
+'''
+Tests for the Manager actions answered by a list of events, run against a
+scripted fake socket.
+'''
+
+import socket
+import unittest
+from unittest import mock
+
+import Asterisk.Manager
+
+
+def _packet(*lines):
+    'Return the wire form of a packet made of header <lines>.'
+    return ''.join(line + '\r\n' for line in lines) + '\r\n'
+
+
+# Sent after the terminating event of every reply; must be left unread.
+_FOLLOWING = _packet('Event: Following', 'Privilege: system,all')
+
+# An event nobody asked for, sent in the middle of each list.
+_UNRELATED = _packet('Event: Newexten', 'Channel: SIP/100-0001', 'Exten: s')
+
+
+class FakeSocket(object):
+    '''
+    Stand in for the socket of a Manager: each action sent is answered with
+    the reply scripted for it in <replies>, where "%(id)s" is replaced by its
+    ActionID.
+    '''
+
+    def __init__(self, replies):
+        self.replies = dict(replies)
+        self.replies.setdefault('Login', _packet(
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Authentication accepted'))
+        self.received = bytearray(b'Asterisk Call Manager/1.1\r\n')
+        self.sent = []
+
+    def setsockopt(self, *args):
+        pass
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect(self, address):
+        pass
+
+    def fileno(self):
+        return -1
+
+    def sendall(self, data):
+        for request in bytes(data).split(b'\r\n\r\n')[:-1]:
+            headers = dict(line.split(': ', 1)
+                           for line in request.decode().split('\r\n'))
+            self.sent.append(headers)
+            reply = self.replies[headers['Action']]
+            self.received += (reply % {'id': headers['ActionID']}).encode()
+
+    def recv_into(self, view):
+        count = min(len(view), len(self.received))
+        view[:count] = self.received[:count]
+        del self.received[:count]
+        return count
+
+
+class CollectorTestCase(unittest.TestCase):
+    'Check each collector stops at its terminating event.'
+
+    def collect(self, method, action, response, events, complete):
+        '''
+        Call Manager.<method>() against a fake PBX answering <action> with
+        <response>, the <events> with the unrelated event inserted after the
+        first one, the <complete> terminator and then a following packet.
+        Return the result, after checking that the following packet is the
+        next one left unread.
+        '''
+
+        events = [_packet(*lines) for lines in events]
+        reply = ''.join([_packet(*response)] + events[:1] + [_UNRELATED] +
+                        events[1:] + [_packet(*complete), _FOLLOWING])
+        sock = FakeSocket({action: reply})
+
+        with mock.patch.object(socket, 'socket', lambda *args: sock):
+            manager = Asterisk.Manager.Manager(('pbx', 5038), 'user', 'pw')
+
+        unrelated = []
+        manager.events.subscribe(
+            'Newexten', lambda manager, event: unrelated.append(event))
+
+        result = getattr(manager, method)()
+
+        self.assertEqual(len(unrelated), 1)
+        self.assertEqual(manager._next_packet()['Event'], 'Following')
+        self.assertIsNone(manager._next_packet())
+        self.assertEqual(sock.received, b'')
+        return result
+
+    def test_parked_calls(self):
+        result = self.collect('ParkedCalls', 'ParkedCalls', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Parked calls will follow'
+        ], [
+            ['Event: ParkedCall', 'ActionID: %(id)s', 'Exten: 701',
+             'Timeout: 45'],
+            ['Event: ParkedCall', 'ActionID: %(id)s', 'Exten: 702',
+             'Timeout: 30'],
+        ], ['Event: ParkedCallsComplete', 'ActionID: %(id)s'])
+
+        self.assertEqual(result, {'701': {'Timeout': '45'},
+                                  '702': {'Timeout': '30'}})
+
+    def test_queue_status(self):
+        result = self.collect('QueueStatus', 'QueueStatus', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Queue status will follow'
+        ], [
+            ['Event: QueueParams', 'ActionID: %(id)s', 'Queue: sales',
+             'Calls: 1'],
+            ['Event: QueueMember', 'ActionID: %(id)s', 'Queue: sales',
+             'Location: SIP/100', 'Penalty: 0'],
+            ['Event: QueueEntry', 'ActionID: %(id)s', 'Queue: sales',
+             'Channel: SIP/300-0003', 'Position: 1'],
+        ], ['Event: QueueStatusComplete', 'ActionID: %(id)s'])
+
+        self.assertEqual(list(result), ['sales'])
+        queue = result['sales']
+        self.assertEqual(queue['Calls'], '1')
+        self.assertEqual(queue['members'], {'SIP/100': {'Penalty': '0'}})
+        self.assertEqual([str(channel) for channel in queue['entries']],
+                         ['SIP/300-0003'])
+        self.assertEqual(list(queue['entries'].values()), [{'Position': '1'}])
+
+    def test_sip_show_registry(self):
+        result = self.collect('SipShowRegistry', 'SIPshowregistry', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Registrations will follow'
+        ], [
+            ['Event: RegistryEntry', 'ActionID: %(id)s',
+             'Host: sip.example.com', 'State: Registered'],
+        ], ['Event: RegistrationsComplete', 'ActionID: %(id)s'])
+
+        self.assertEqual(result, {'sip.example.com': {'State': 'Registered'}})
+
+    def test_sip_peers(self):
+        result = self.collect('SipPeers', 'SIPpeers', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Peer status list will follow'
+        ], [
+            ['Event: PeerEntry', 'ActionID: %(id)s', 'ObjectName: 100',
+             'IPaddress: 10.0.0.1'],
+            ['Event: PeerEntry', 'ActionID: %(id)s', 'ObjectName: 101',
+             'IPaddress: 10.0.0.2'],
+        ], ['Event: PeerlistComplete', 'ActionID: %(id)s', 'ListItems: 2'])
+
+        self.assertEqual(result, {'100': {'IPaddress': '10.0.0.1'},
+                                  '101': {'IPaddress': '10.0.0.2'}})
+
+    def test_status(self):
+        result = self.collect('Status', 'Status', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Channel status will follow'
+        ], [
+            ['Event: Status', 'ActionID: %(id)s', 'Channel: SIP/100-0001',
+             'State: Up'],
+            ['Event: Status', 'ActionID: %(id)s', 'Channel: SIP/200-0002',
+             'State: Ring'],
+        ], ['Event: StatusComplete', 'ActionID: %(id)s', 'Items: 2'])
+
+        self.assertEqual(
+            sorted((str(channel), status) for channel, status in
+                   result.items()),
+            [('SIP/100-0001', {'State': 'Up'}),
+             ('SIP/200-0002', {'State': 'Ring'})])
+
+    def test_core_show_channels(self):
+        result = self.collect('CoreShowChannels', 'CoreShowChannels', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Channels will follow'
+        ], [
+            ['Event: CoreShowChannel', 'ActionID: %(id)s',
+             'Channel: SIP/100-0001', 'Duration: 1'],
+        ], ['Event: CoreShowChannelsComplete', 'ActionID: %(id)s'])
+
+        self.assertEqual([(event['Event'], str(event['Channel']))
+                          for event in result],
+                         [('CoreShowChannel', 'SIP/100-0001')])
+
+    def test_zap_show_channels(self):
+        result = self.collect('ZapShowChannels', 'ZapShowChannels', [
+            'Response: Success', 'ActionID: %(id)s',
+            'Message: Zap channels will follow'
+        ], [
+            ['Event: ZapShowChannels', 'ActionID: %(id)s', 'Channel: 2',
+             'Signalling: FXO'],
+            ['Event: ZapShowChannels', 'ActionID: %(id)s', 'Channel: 3',
+             'Signalling: FXS'],
+        ], ['Event: ZapShowChannelsComplete', 'ActionID: %(id)s'])
+
+        self.assertEqual(result, {2: {'Signalling': 'FXO'},
+                                  3: {'Signalling': 'FXS'}})
+
+
+if __name__ == '__main__':
+    unittest.main()